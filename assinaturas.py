@@ -0,0 +1,224 @@
+import os
+import re
+import copy
+import threading
+from datetime import datetime
+from app.utils import PATHS, carregar_json, salvar_json, sanitizar_nome
+
+# Arquivo com as fontes assinadas e o histórico de IDs já baixados
+ASSINATURAS_FILE = os.path.join(PATHS["data"], "assinaturas.json")
+
+# ID da playlist na URL (?list=... / &list=...)
+RE_PLAYLIST = re.compile(r'[?&]list=([\w-]+)')
+# Canal sem aba explícita (/@nome, /channel/UC..., /c/..., /user/...)
+RE_CANAL_RAIZ = re.compile(r'^(https?://(?:www\.|m\.)?youtube\.com/(?:@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+))/?(?:[?#].*)?$')
+
+
+def normalizar_fonte(url):
+    """
+    Aponta canais para a aba de vídeos, que o YouTube lista do mais novo
+    para o mais antigo. Playlists e outras URLs são mantidas como estão.
+    """
+    url = url.strip()
+    m = RE_CANAL_RAIZ.match(url)
+    if m:
+        return m.group(1) + "/videos"
+    return url
+
+
+def listagem_recente_primeiro(url):
+    """
+    Canais listam do mais novo para o mais antigo; playlists comuns, do mais
+    antigo (os novos entram no fim). A exceção são as listas de uploads (UU...).
+    """
+    m = RE_PLAYLIST.search(url)
+    if not m:
+        return True
+    return m.group(1).startswith("UU")
+
+
+class GerenciadorAssinaturas:
+    """
+    Sincronização incremental de canais/playlists.
+    Guarda, por fonte, os IDs já baixados. A listagem é percorrida do mais
+    novo para o mais antigo e para no primeiro ID conhecido, então um canal
+    com milhares de vídeos custa só a primeira página por sincronização.
+    """
+    def __init__(self, engine, analisador=None, arquivo=ASSINATURAS_FILE):
+        self.engine = engine
+        self.analisador = analisador or engine # ex.: PoolExtracao
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+        dados = carregar_json(arquivo, {})
+        self.fontes = dados.get("fontes", {})
+        # Fontes salvas antes da detecção de ordem vinham sempre como ordenadas
+        for url, fonte in self.fontes.items():
+            fonte["ordenado"] = fonte.get("ordenado", True) and listagem_recente_primeiro(url)
+        # IDs em set na memória; lista no disco
+        self.arquivo_ids = {url: set(ids) for url, ids in dados.get("arquivo", {}).items()}
+
+    # --- Persistência ---
+    def salvar(self):
+        # Cópia feita sob o lock: a interface pode mexer nas fontes durante
+        # uma sincronização, e a serialização acontece fora dele
+        with self._lock:
+            dados = {
+                "fontes": copy.deepcopy(self.fontes),
+                "arquivo": {url: sorted(ids) for url, ids in self.arquivo_ids.items()}
+            }
+        salvar_json(self.arquivo, dados)
+
+    # --- Cadastro de fontes ---
+    def adicionar(self, url, pasta, tipo="video", resolucao="", ordenado=None, semear=True):
+        """
+        Cadastra uma fonte. Com semear=True, a primeira sincronização apenas
+        registra os vídeos já publicados no arquivo, sem baixá-los (só os
+        próximos uploads serão baixados).
+        ordenado=None detecta pela URL se a listagem vem do mais novo para o
+        mais antigo; se não vier, cada sincronização percorre a lista toda.
+        Retorna a URL normalizada usada como chave.
+        """
+        url = normalizar_fonte(url)
+        if ordenado is None:
+            ordenado = listagem_recente_primeiro(url)
+        with self._lock:
+            self.fontes[url] = {
+                "pasta": pasta,
+                "tipo": tipo,
+                "resolucao": resolucao,
+                "ordenado": ordenado,
+                "semear": semear,
+                "pendentes": [],
+                "ultima_sincronizacao": None
+            }
+            self.arquivo_ids.setdefault(url, set())
+        self.salvar()
+        return url
+
+    def remover(self, url):
+        with self._lock:
+            self.fontes.pop(url, None)
+            self.arquivo_ids.pop(url, None)
+        self.salvar()
+
+    # --- Listagem ---
+    def _listar(self, url, conhecidos, parar_em_conhecido=True):
+        """
+        Percorre a listagem plana da fonte (sem resolver cada vídeo).
+        As entradas vêm de um gerador paginado: interromper a iteração evita
+        que as páginas seguintes sejam requisitadas.
+        """
+        opts = {
+            'quiet': True, 'no_warnings': True, 'nocheckcertificate': True,
+            'extract_flat': 'in_playlist', 'lazy_playlist': True
+        }
+        if self.engine.cookies.disponivel():
+            opts['perfil_cookies'] = self.engine.cookies.ativo
+        # Mesma saída e sessões aquecidas das análises e downloads
+        rotas = self.engine.rotas
+        rota = rotas.adquirir() if rotas else None
+        if rota: opts.update(rota.opcoes())
+
+        erro = None
+        try:
+            with self.engine.sessoes.usar(opts) as ydl:
+                info = ydl.extract_info(url, download=False, process=False)
+                # Alguns extratores devolvem apenas um redirecionamento
+                while info and info.get('_type') in ('url', 'url_transparent'):
+                    info = ydl.extract_info(info['url'], download=False, process=False)
+
+                for entrada in (info or {}).get('entries') or []:
+                    if not entrada or not entrada.get('id'):
+                        continue
+                    if entrada['id'] in conhecidos:
+                        if parar_em_conhecido:
+                            break
+                        continue
+                    yield {
+                        "id": entrada['id'],
+                        "title": entrada.get('title'),
+                        "url": entrada.get('url') or f"https://www.youtube.com/watch?v={entrada['id']}"
+                    }
+        except Exception as e:
+            erro = e
+            raise
+        finally:
+            if rota: rotas.liberar(rota, erro=erro)
+
+    def novos(self, url):
+        """Lista as entradas ainda não baixadas de uma fonte, na ordem da listagem."""
+        with self._lock:
+            fonte = self.fontes[url]
+            conhecidos = set(self.arquivo_ids.get(url, ()))
+        novos = list(self._listar(url, conhecidos, parar_em_conhecido=fonte.get("ordenado", True)))
+
+        # Falhas de sincronizações anteriores ficam abaixo do último ID conhecido
+        ids_novos = {e["id"] for e in novos}
+        for pendente in fonte.get("pendentes", []):
+            if pendente["id"] not in ids_novos and pendente["id"] not in conhecidos:
+                novos.append(pendente)
+        return novos
+
+    # --- Sincronização ---
+    def sincronizar(self, url=None, progress_hook=None, log=print, cancelado=None):
+        """
+        Baixa as novidades de uma fonte (ou de todas, se url=None) pelo
+        pipeline normal: analisar_camaleao + baixar.
+        Retorna a quantidade de vídeos baixados.
+        """
+        with self._lock:
+            urls = [url] if url else list(self.fontes.keys())
+        total = 0
+
+        for fonte_url in urls:
+            fonte = self.fontes.get(fonte_url)
+            if not fonte: continue
+
+            try:
+                if fonte.get("semear"):
+                    # Primeira passada: listagem completa, nada é baixado
+                    existentes = {e["id"] for e in self._listar(fonte_url, set(), parar_em_conhecido=False)}
+                    with self._lock:
+                        self.arquivo_ids.setdefault(fonte_url, set()).update(existentes)
+                        fonte["semear"] = False
+                        fonte["ultima_sincronizacao"] = datetime.now().strftime("%d/%m/%Y %H:%M")
+                    self.salvar()
+                    log(f"{fonte_url}: {len(existentes)} vídeo(s) existente(s) registrados")
+                    continue
+                entradas = self.novos(fonte_url)
+            except Exception as e:
+                log(f"Erro ao listar {fonte_url}: {e}")
+                continue
+
+            log(f"{fonte_url}: {len(entradas)} novo(s)")
+            pendentes = []
+
+            # Baixa do mais antigo para o mais novo
+            fila = list(reversed(entradas)) if fonte.get("ordenado", True) else list(entradas)
+            for i, entrada in enumerate(fila):
+                if cancelado and cancelado():
+                    pendentes.extend(fila[i:])
+                    break
+                try:
+                    log(f"Baixando: {entrada.get('title') or entrada['id']}")
+                    info, opts, _ = self.analisador.analisar_camaleao(entrada["url"])
+                    nome = sanitizar_nome(info.get('title') or entrada['id'])
+                    self.engine.baixar(entrada["url"], fonte["pasta"], nome, fonte["tipo"],
+                                       fonte.get("resolucao", ""), opts, progress_hook or (lambda d: None))
+                    with self._lock:
+                        self.arquivo_ids.setdefault(fonte_url, set()).add(entrada["id"])
+                    total += 1
+                except Exception as e:
+                    log(f"Falha em {entrada['id']}: {e}")
+                    pendentes.append(entrada)
+                # Salva a cada item para não perder progresso se o app fechar
+                with self._lock:
+                    fonte["pendentes"] = pendentes + fila[i + 1:]
+                self.salvar()
+
+            with self._lock:
+                fonte["pendentes"] = pendentes
+                fonte["ultima_sincronizacao"] = datetime.now().strftime("%d/%m/%Y %H:%M")
+            self.salvar()
+
+        return total
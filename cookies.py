@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from http.cookiejar import Cookie
+from yt_dlp.cookies import YoutubeDLCookieJar
+from app.utils import PATHS
+
+# Perfis extras: data/cookies/<nome>.json ou <nome>.txt
+COOKIES_DIR = os.path.join(PATHS["data"], "cookies")
+
+
+def _cookie_de_json(c):
+    """Converte um cookie exportado pelo navegador (JSON) em Cookie do http.cookiejar."""
+    domain = c.get('domain', '')
+    if not domain.startswith('.'): domain = '.' + domain
+    expira = c.get('expirationDate', c.get('expiry'))
+    return Cookie(
+        version=0, name=c.get('name'), value=c.get('value'),
+        port=None, port_specified=False,
+        domain=domain, domain_specified=True, domain_initial_dot=domain.startswith('.'),
+        path=c.get('path', '/'), path_specified=True,
+        secure=bool(c.get('secure', False)),
+        expires=int(expira) if expira else int(time.time() + 31536000),
+        discard=False, comment=None, comment_url=None,
+        rest={'HttpOnly': None} if c.get('httpOnly') else {}
+    )
+
+
+class _Perfil:
+    """Um arquivo de cookies e o jar carregado a partir dele."""
+    def __init__(self, nome, caminho):
+        self.nome = nome
+        self.caminho = caminho
+        self.mtime = None
+        self.hash = None
+        self.jar = None
+
+    def atualizar(self):
+        """Recarrega se o arquivo mudou (mtime e depois hash). Retorna True se trocou o jar."""
+        try:
+            mtime = os.stat(self.caminho).st_mtime
+        except OSError:
+            mudou = self.jar is not None
+            self.mtime = self.hash = self.jar = None
+            return mudou
+        if mtime == self.mtime:
+            return False
+
+        with open(self.caminho, 'rb') as f:
+            conteudo = f.read()
+        self.mtime = mtime
+        hash_ = hashlib.sha1(conteudo).hexdigest()
+        if hash_ == self.hash:
+            return False
+
+        jar = YoutubeDLCookieJar()
+        if self.caminho.endswith('.json'):
+            for c in json.loads(conteudo.decode('utf-8')):
+                jar.set_cookie(_cookie_de_json(c))
+        else:
+            # Sem filename no jar: nada é regravado no arquivo do usuário
+            jar.load(self.caminho, ignore_discard=True, ignore_expires=True)
+
+        # Troca a referência de uma vez: quem já pegou o jar antigo segue com ele
+        self.jar = jar
+        self.hash = hash_
+        return True
+
+
+class ServicoCookies:
+    """
+    Cookies carregados uma vez na memória e compartilhados por todas as
+    sessões do yt-dlp. Uma thread de fundo observa os arquivos e só
+    recarrega quando mtime e conteúdo mudam, então pegar o jar não faz I/O.
+
+    Perfis: "padrao" (cookies.json/cookies.txt na raiz, o mais recente) e
+    um por arquivo em data/cookies/. rotacionar() passa para o próximo.
+    """
+    def __init__(self, intervalo=5.0):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self.perfis = {}
+        self.ativo = "padrao"
+        self._descobrir()
+
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    # --- Descoberta e recarga ---
+    def _arquivo_padrao(self):
+        candidatos = [os.path.join(PATHS["root"], n) for n in ("cookies.json", "cookies.txt")]
+        existentes = [c for c in candidatos if os.path.exists(c)]
+        if not existentes:
+            return candidatos[0]
+        return max(existentes, key=os.path.getmtime)
+
+    def _descobrir(self):
+        caminhos = {"padrao": self._arquivo_padrao()}
+        if os.path.isdir(COOKIES_DIR):
+            for arquivo in sorted(os.listdir(COOKIES_DIR)):
+                nome, ext = os.path.splitext(arquivo)
+                if ext in ('.json', '.txt'):
+                    caminhos.setdefault(nome, os.path.join(COOKIES_DIR, arquivo))
+
+        with self._lock:
+            for nome, caminho in caminhos.items():
+                perfil = self.perfis.get(nome)
+                if not perfil or perfil.caminho != caminho:
+                    self.perfis[nome] = _Perfil(nome, caminho)
+            for nome in list(self.perfis):
+                if nome not in caminhos:
+                    del self.perfis[nome]
+            if self.ativo not in self.perfis:
+                self.ativo = "padrao"
+            perfis = list(self.perfis.values())
+
+        for perfil in perfis:
+            try:
+                if perfil.atualizar() and perfil.jar is not None:
+                    print(f"Cookies carregados: perfil '{perfil.nome}' ({len(perfil.jar)} cookies)")
+            except Exception as e:
+                print(f"Erro ao carregar cookies do perfil '{perfil.nome}': {e}")
+
+        # Perfil ativo sem cookies: passa para o primeiro que tenha
+        with self._lock:
+            atual = self.perfis.get(self.ativo)
+            if not atual or atual.jar is None:
+                carregado = next((n for n, p in self.perfis.items() if p.jar is not None), None)
+                if carregado:
+                    self.ativo = carregado
+
+    def _loop(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self._descobrir()
+            except Exception as e:
+                print(f"Erro ao verificar cookies: {e}")
+
+    # --- API ---
+    def jar(self, perfil=None):
+        """Jar do perfil (ou do ativo), sem tocar no disco. None se não houver cookies."""
+        with self._lock:
+            p = self.perfis.get(perfil or self.ativo)
+            return p.jar if p else None
+
+    def disponivel(self):
+        return self.jar() is not None
+
+    def rotacionar(self):
+        """Passa para o próximo perfil com cookies carregados. Retorna o nome do novo ativo."""
+        with self._lock:
+            nomes = [n for n, p in self.perfis.items() if p.jar is not None]
+            if nomes:
+                i = nomes.index(self.ativo) if self.ativo in nomes else -1
+                self.ativo = nomes[(i + 1) % len(nomes)]
+            return self.ativo
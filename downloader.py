@@ -1,97 +1,140 @@
 import yt_dlp
 import os
-import json
-import time
-from app.utils import PATHS, get_binary_path, sanitizar_nome
+from app.cookies import ServicoCookies
+from app.rotas import eh_bloqueio, eh_recusa
+from app.sessoes import PoolSessoes
+from app.utils import get_binary_path, sanitizar_nome
 
 class YouTubeEngine:
-    def __init__(self):
+    def __init__(self, rotas=None, jornal=None):
+        self.rotas = rotas # PoolRotas opcional (proxies/endereços de saída)
+        self.jornal = jornal # JornalTarefas opcional (retomar downloads)
         self.ffmpeg_path = get_binary_path("ffmpeg.exe")
         self.qjs_path = get_binary_path("qjs.exe")
-        self.cookies_txt = os.path.join(PATHS["root"], "cookies.txt")
-        self.cookies_json = os.path.join(PATHS["root"], "cookies.json")
-        
+        # Cookies ficam na memória e são recarregados só quando o arquivo muda
+        self.cookies = ServicoCookies()
+        # YoutubeDL aquecidos, reaproveitados entre análises e downloads
+        self.sessoes = PoolSessoes(self._criar_ydl, versao=self._versao_cookies)
+
         # Configura ambiente para o QuickJS (necessário para decriptar 4K)
         qjs_dir = os.path.dirname(self.qjs_path)
         if os.path.exists(qjs_dir) and qjs_dir not in os.environ['PATH']:
             os.environ['PATH'] += os.pathsep + qjs_dir
 
-        # Tenta converter cookies ao iniciar a engine
-        self._converter_cookies()
-
-    def _converter_cookies(self):
-        """Converte cookies.json para formato Netscape se necessário."""
-        if os.path.exists(self.cookies_txt): return
-        if not os.path.exists(self.cookies_json): return
+    def _criar_ydl(self, opts):
+        """
+        Cria o YoutubeDL. 'perfil_cookies' nas opções (em vez de 'cookiefile')
+        liga o jar em memória do perfil, sem ler arquivo a cada instância.
+        """
+        opts = dict(opts)
+        perfil = opts.pop('perfil_cookies', None)
+        ydl = yt_dlp.YoutubeDL(opts)
+        if perfil:
+            jar = self.cookies.jar(perfil)
+            if jar is not None:
+                ydl.cookiejar = jar
+        return ydl
 
-        try:
-            with open(self.cookies_json, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-            
-            with open(self.cookies_txt, 'w', encoding='utf-8') as f:
-                f.write("# Netscape HTTP Cookie File\n\n")
-                for c in dados:
-                    domain = c.get('domain', '')
-                    if not domain.startswith('.'): domain = '.' + domain
-                    path = c.get('path', '/')
-                    secure = 'TRUE' if c.get('secure', False) else 'FALSE'
-                    exp = str(int(c.get('expirationDate', c.get('expiry', time.time() + 31536000))))
-                    f.write(f"{domain}\tTRUE\t{path}\t{secure}\t{exp}\t{c.get('name')}\t{c.get('value')}\n")
-        except Exception as e:
-            print(f"Erro ao converter cookies: {e}")
+    def _versao_cookies(self, opts):
+        # Sessões guardam o jar da criação; jar recarregado pede sessão nova
+        return self.cookies.jar(opts['perfil_cookies']) if opts.get('perfil_cookies') else None
 
     def _limpar_cache(self):
         try:
-            with yt_dlp.YoutubeDL() as ydl:
+            with self.sessoes.usar({'quiet': True}) as ydl:
                 ydl.cache.remove()
         except: pass
 
-    def analisar_camaleao(self, url):
+    def fechar(self):
+        self.sessoes.fechar()
+
+    def analisar_camaleao(self, url, limpar_cache=True, rede=None):
         """
         Executa a estratégia de 5 passos para driblar o erro 403.
+        rede: opções de saída fixas (proxy/source_address). Sem ela, a análise
+        inteira usa a rota menos ocupada do pool de rotas, se houver, e o
+        resultado combinado das estratégias é reportado uma vez só.
         Retorna: (info_dict, opcoes_vencedoras, nome_da_estrategia)
         """
-        self._limpar_cache()
+        if limpar_cache:
+            self._limpar_cache()
         erros = []
 
         # Estratégias definidas em ordem de qualidade/prioridade
         estrategias = [
             ("Web Padrão", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True}),
-            ("Web + Cookies", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'cookiefile': self.cookies_txt}),
+            ("Web + Cookies", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'perfil_cookies': self.cookies.ativo}),
             ("iOS", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'extractor_args': {'youtube': {'player_client': ['ios']}}}),
             ("Android", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'extractor_args': {'youtube': {'player_client': ['android']}}}),
             ("Smart TV", {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'extractor_args': {'youtube': {'player_client': ['tv']}}})
         ]
 
-        for nome, opts in estrategias:
-            # Pula estratégia de cookies se não tiver arquivo
-            if nome == "Web + Cookies" and not os.path.exists(self.cookies_txt):
-                continue
+        rota = self.rotas.adquirir() if self.rotas and rede is None else None
+        rede = rede or (rota.opcoes() if rota else {})
+        erro = None
+        try:
+            for nome, opts in estrategias:
+                # Pula estratégia de cookies se não tiver arquivo
+                if nome == "Web + Cookies" and not self.cookies.disponivel():
+                    continue
 
-            try:
-                print(f"Tentando estratégia: {nome}...")
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
+                opts = {**opts, **rede}
+                try:
+                    print(f"Tentando estratégia: {nome}..." + (f" (rota {rota.nome})" if rota else ""))
+                    with self.sessoes.usar(opts) as ydl:
+                        info = ydl.extract_info(url, download=False)
                     return info, opts, nome
-            except Exception as e:
-                erros.append(f"{nome}: {str(e)}")
-                # Se for erro de link inválido (não de bloqueio), para logo
-                if "videoid" in str(e).lower() and "incomplete" in str(e).lower():
-                    raise e
+                except Exception as e:
+                    erros.append(f"{nome}: {str(e)}")
+                    # Cookies recusados: a próxima análise usa outro perfil
+                    if nome == "Web + Cookies" and (eh_bloqueio(e) or eh_recusa(e)):
+                        self.cookies.rotacionar()
+                    # Se for erro de link inválido (não de bloqueio), para logo
+                    if "videoid" in str(e).lower() and "incomplete" in str(e).lower():
+                        erro = e
+                        raise e
 
-        raise Exception(f"Todas as estratégias falharam. Detalhes: {erros}")
+            erro = Exception(f"Todas as estratégias falharam. Detalhes: {erros}")
+            raise erro
+        finally:
+            # Uma estratégia que funcionou basta para contar como sucesso da rota
+            if rota: self.rotas.liberar(rota, erro=erro)
 
-    def baixar(self, url, pasta, nome_arquivo, tipo, resolucao, opcoes_base, progress_hook):
+    def baixar(self, url, pasta, nome_arquivo, tipo, resolucao, opcoes_base, progress_hook, tarefa_id=None):
         """
         Realiza o download usando as opções que venceram na análise.
+        Com diário de tarefas, o download é registrado (ou, com tarefa_id,
+        retomado) para continuar de onde parou se o app fechar.
         """
+        if not self.jornal:
+            tarefa_id = None
+        elif tarefa_id is None:
+            tarefa_id = self.jornal.registrar(url, pasta, nome_arquivo, tipo, resolucao, opcoes_base)
+
         opts = opcoes_base.copy()
-        
+
+        # Com pool de rotas, o download pega a rota menos ocupada agora
+        rota = None
+        if self.rotas:
+            opts.pop('proxy', None)
+            opts.pop('source_address', None)
+            rota = self.rotas.adquirir()
+            opts.update(rota.opcoes())
+
+        # Velocidade média para detectar rota estrangulada
+        amostras = [0.0, 0]
+        def hook(d):
+            if d.get('status') == 'downloading' and d.get('speed'):
+                amostras[0] += d['speed']
+                amostras[1] += 1
+            if tarefa_id: self.jornal.progresso(tarefa_id, d)
+            progress_hook(d)
+
         # Configurações de Saída
         opts.update({
             'outtmpl': os.path.join(pasta, f"{nome_arquivo}.%(ext)s"),
             'ffmpeg_location': os.path.dirname(self.ffmpeg_path),
-            'progress_hooks': [progress_hook],
+            'progress_hooks': [hook],
             'nocheckcertificate': True
         })
 
@@ -110,5 +153,20 @@ class YouTubeEngine:
                 opts['format'] = 'bestvideo+bestaudio/best'
             opts['merge_output_format'] = 'mp4'
 
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            return ydl.extract_info(url, download=True)
\ No newline at end of file
+        try:
+            with self.sessoes.usar(opts) as ydl:
+                resultado = ydl.extract_info(url, download=True)
+        except Exception as e:
+            if rota: self.rotas.liberar(rota, erro=e)
+            if tarefa_id: self.jornal.falhar(tarefa_id, e)
+            raise
+
+        if tarefa_id: self.jornal.concluir(tarefa_id)
+        if rota:
+            self.rotas.liberar(rota, velocidade=amostras[0] / amostras[1] if amostras[1] else None)
+        return resultado
+
+    def retomar(self, tarefa, progress_hook):
+        """Refaz um download do diário com os mesmos parâmetros (continua o .part)."""
+        return self.baixar(tarefa['url'], tarefa['pasta'], tarefa['nome'], tarefa['tipo'],
+                           tarefa['resolucao'], tarefa['opts'], progress_hook, tarefa_id=tarefa['id'])
\ No newline at end of file
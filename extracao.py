@@ -0,0 +1,329 @@
+import os
+import time
+import threading
+import collections
+import multiprocessing
+from multiprocessing.connection import wait
+from concurrent.futures import Future, CancelledError
+from app.rotas import eh_bloqueio
+
+# Campos mantidos na resposta dos processos (o info_dict completo tem vários MB)
+CAMPOS_INFO = ('id', 'title', 'webpage_url', 'duration', 'uploader', 'channel', 'thumbnail',
+               'filesize', 'filesize_approx', 'extractor_key', 'upload_date')
+CAMPOS_FORMATO = ('format_id', 'ext', 'height', 'width', 'fps', 'vcodec', 'acodec',
+                  'filesize', 'filesize_approx', 'tbr')
+
+
+def compactar_info(info):
+    """Reduz o info_dict ao que a interface e o download usam."""
+    compacto = {k: info.get(k) for k in CAMPOS_INFO if info.get(k) is not None}
+    compacto['formats'] = [{k: f.get(k) for k in CAMPOS_FORMATO if f.get(k) is not None}
+                           for f in info.get('formats') or []]
+    return compacto
+
+
+def _iniciar(future):
+    """Marca o Future como em execução; False se ele foi cancelado na fila."""
+    return future.running() or future.set_running_or_notify_cancel()
+
+
+def _resolver(future, ok, dados):
+    if future.done(): return
+    if ok:
+        future.set_result(dados)
+    else:
+        future.set_exception(dados if isinstance(dados, BaseException) else Exception(dados))
+
+
+def _processo_extracao(conn):
+    """
+    Loop do processo filho. Mantém yt_dlp importado e uma engine própria,
+    então imports e cache em disco ficam quentes entre análises.
+    """
+    from app.downloader import YouTubeEngine
+    engine = YouTubeEngine()
+    # O cache em disco é compartilhado entre os processos: quem limpa é o
+    # pool, uma vez ao iniciar, e não cada processo que sobe
+    conn.send(("pronto", None, None))
+
+    while True:
+        try:
+            tarefa = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if tarefa is None:
+            break
+
+        id_tarefa, url, rede = tarefa
+        try:
+            info, opts, nome = engine.analisar_camaleao(url, limpar_cache=False, rede=rede)
+            conn.send((id_tarefa, True, (compactar_info(info), opts, nome)))
+        except Exception as e:
+            conn.send((id_tarefa, False, str(e)))
+
+
+class _Trabalhador:
+    """Um processo de extração e a tarefa que está executando."""
+    def __init__(self, ctx):
+        self.conn, conn_filho = ctx.Pipe()
+        self.processo = ctx.Process(target=_processo_extracao, args=(conn_filho,), daemon=True)
+        self.processo.start()
+        conn_filho.close()
+        self.pronto = False
+        self.tarefa = None   # (id, future, url, tentativas)
+        self.rota = None
+        self.inicio = 0.0
+        self.concluidas = 0
+
+    def encerrar(self):
+        try:
+            self.conn.send(None)
+        except Exception: pass
+        self.processo.join(timeout=1)
+        if self.processo.is_alive():
+            self.processo.terminate()
+        self.conn.close()
+
+
+class PoolExtracao:
+    """
+    Pool de processos de extração para tirar o trabalho pesado do yt-dlp
+    (parse de JSON, JS de assinatura, ordenação de formatos) do processo da
+    interface. Processos que travam ou morrem são substituídos.
+    Expõe analisar_camaleao(url) com a mesma assinatura da engine; se os
+    processos não conseguirem subir, usa a engine local como reserva.
+    A rota de saída de cada análise é escolhida aqui, no processo principal,
+    para que a saúde das rotas seja uma só para todos os processos.
+    """
+    def __init__(self, engine=None, processos=None, timeout=180, max_tarefas=200, rotas=None):
+        self.engine = engine
+        self.rotas = rotas
+        self.processos = processos or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.timeout = timeout
+        self.max_tarefas = max_tarefas  # recicla o processo para limitar memória
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._fila = collections.deque()
+        self._seq = 0
+        self._ativo = True
+        self._falhas_inicio = 0
+        self._quebrado = None  # motivo, se os processos não sobem
+        self._cancelados = set()  # Futures em execução cujo resultado será descartado
+        self._sinal_r, self._sinal_w = self._ctx.Pipe(duplex=False)
+        if engine:
+            engine._limpar_cache()
+        self._trabalhadores = [_Trabalhador(self._ctx) for _ in range(self.processos)]
+
+        self._despachante = threading.Thread(target=self._loop, daemon=True)
+        self._despachante.start()
+
+    # --- API pública ---
+    def submeter(self, url):
+        """Enfileira a análise e retorna um Future com (info, opts, estrategia)."""
+        future = Future()
+        with self._lock:
+            local = self._quebrado is not None
+            if not local:
+                if not self._ativo:
+                    raise RuntimeError("Pool de extração encerrado")
+                self._seq += 1
+                self._fila.append((self._seq, future, url, 0))
+        if local:
+            self._executar_local(future, url)
+        else:
+            self._acordar()
+        return future
+
+    def analisar_camaleao(self, url):
+        return self.submeter(url).result()
+
+    def cancelar(self, future):
+        """
+        Cancela uma análise. Na fila, só sai da fila; já num processo, o
+        Future é resolvido como cancelado e o resultado, quando chegar, é
+        descartado. O processo segue vivo (e com o cache quente).
+        """
+        if future.cancel(): return
+        with self._lock:
+            self._cancelados.add(future)
+        self._acordar()
+
+    def encerrar(self):
+        with self._lock:
+            self._ativo = False
+            pendentes = list(self._fila)
+            self._fila.clear()
+        for _, future, _, _ in pendentes:
+            if not future.cancel():
+                _resolver(future, False, CancelledError())
+        self._acordar()
+        self._despachante.join(timeout=5)
+
+    # --- Despacho ---
+    def _acordar(self):
+        with self._lock:
+            try:
+                self._sinal_w.send(None)
+            except Exception: pass
+
+    def _executar_local(self, future, url):
+        if not self.engine:
+            future.set_exception(Exception(f"Processos de extração indisponíveis: {self._quebrado}"))
+            return
+
+        def executar():
+            try:
+                resultado = self.engine.analisar_camaleao(url)
+            except Exception as e:
+                if _iniciar(future):
+                    _resolver(future, False, e)
+                return
+            if _iniciar(future):
+                _resolver(future, True, resultado)
+
+        threading.Thread(target=executar, daemon=True).start()
+
+    def _loop(self):
+        while self._ativo:
+            conns = [t.conn for t in self._trabalhadores]
+            prontas = wait(conns + [self._sinal_r], timeout=1.0)
+
+            for conn in prontas:
+                if conn is self._sinal_r:
+                    while self._sinal_r.poll():
+                        self._sinal_r.recv()
+                    continue
+                trab = next((t for t in self._trabalhadores if t.conn is conn), None)
+                if trab is None: continue  # já reciclado nesta volta
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    self._reciclar(trab, "Processo de extração encerrou inesperadamente")
+                    continue
+                self._receber(trab, msg)
+
+            if not self._ativo: break
+            self._abortar_cancelados()
+            self._verificar_travados()
+            if not self._ativo: break
+            self._despachar()
+
+        for trab in self._trabalhadores:
+            if trab.tarefa:
+                _resolver(trab.tarefa[1], False, CancelledError())
+            self._liberar_rota(trab, "Pool de extração encerrado")
+            trab.encerrar()
+
+    def _receber(self, trab, msg):
+        id_tarefa, ok, dados = msg
+        if id_tarefa == "pronto":
+            trab.pronto = True
+            return
+        if not trab.tarefa or trab.tarefa[0] != id_tarefa:
+            return
+        id_tarefa, future, url, tentativas = trab.tarefa
+        trab.tarefa = None
+        trab.concluidas += 1
+        self._liberar_rota(trab, None if ok else dados)
+
+        # Bloqueio do endereço (429, "not a bot"): tenta mais uma vez, que cairá em
+        # outra rota. 403 não entra: costuma ser do vídeo e falharia lá também.
+        # Análise cancelada enquanto rodava: _resolver descarta o resultado
+        if (not ok and not future.done() and eh_bloqueio(dados) and tentativas < 1
+                and self.rotas and len(self.rotas.rotas) > 1):
+            with self._lock:
+                self._fila.appendleft((id_tarefa, future, url, tentativas + 1))
+        else:
+            _resolver(future, ok, dados)
+        if trab.concluidas >= self.max_tarefas:
+            self._reciclar(trab, None)
+
+    def _verificar_travados(self):
+        agora = time.monotonic()
+        for trab in list(self._trabalhadores):
+            if trab.tarefa and agora - trab.inicio > self.timeout:
+                self._reciclar(trab, f"Tempo limite de análise excedido ({self.timeout}s)", repetir=False)
+            elif not trab.processo.is_alive():
+                self._reciclar(trab, "Processo de extração encerrou inesperadamente")
+
+    def _reciclar(self, trab, erro, repetir=True):
+        """Substitui o processo. A tarefa em curso é repetida uma vez (crash) ou falha (trava)."""
+        tarefa = trab.tarefa
+        trab.tarefa = None
+        self._liberar_rota(trab, erro)
+        if erro and trab.processo.is_alive():
+            trab.processo.terminate()
+        trab.encerrar()
+
+        # Processos que morrem antes de ficarem prontos não serão recriados para sempre
+        self._falhas_inicio = 0 if trab.pronto else self._falhas_inicio + 1
+        if self._falhas_inicio >= 3:
+            self._desistir(erro, tarefa)
+            return
+        self._trabalhadores[self._trabalhadores.index(trab)] = _Trabalhador(self._ctx)
+
+        if tarefa:
+            id_tarefa, future, url, tentativas = tarefa
+            if repetir and tentativas < 1 and not future.done():
+                with self._lock:
+                    self._fila.appendleft((id_tarefa, future, url, tentativas + 1))
+            else:
+                _resolver(future, False, erro)
+
+    def _abortar_cancelados(self):
+        with self._lock:
+            cancelados = self._cancelados
+            self._cancelados = set()
+            # Ainda na fila (ex.: esperando nova tentativa): basta tirar de lá
+            restantes = [t for t in self._fila if t[1] not in cancelados]
+            self._fila.clear()
+            self._fila.extend(restantes)
+        for future in cancelados:
+            _resolver(future, False, CancelledError())
+
+    def _desistir(self, erro, tarefa):
+        """Desliga os processos e manda todo o trabalho pendente para a engine local."""
+        with self._lock:
+            self._quebrado = erro
+            self._ativo = False
+            pendentes = list(self._fila)
+            self._fila.clear()
+        for trab in self._trabalhadores:
+            if trab.tarefa:
+                pendentes.append(trab.tarefa)
+                trab.tarefa = None
+            self._liberar_rota(trab, erro)
+        if tarefa:
+            pendentes.append(tarefa)
+        for _, future, url, _ in pendentes:
+            if not future.done():
+                self._executar_local(future, url)
+
+    def _liberar_rota(self, trab, erro):
+        if trab.rota:
+            self.rotas.liberar(trab.rota, erro=erro)
+            trab.rota = None
+
+    def _despachar(self):
+        for trab in self._trabalhadores:
+            if not trab.pronto or trab.tarefa: continue
+            with self._lock:
+                # Descarta tarefas canceladas antes de chegarem a um processo;
+                # a partir daqui o Future fica "em execução" e só cancelar() o para
+                while self._fila and not _iniciar(self._fila[0][1]):
+                    self._fila.popleft()
+                if not self._fila: return
+                tarefa = self._fila.popleft()
+            if self.rotas:
+                trab.rota = self.rotas.adquirir()
+            rede = trab.rota.opcoes() if trab.rota else None
+            try:
+                trab.conn.send((tarefa[0], tarefa[2], rede))
+            except (BrokenPipeError, OSError):
+                with self._lock:
+                    self._fila.appendleft(tarefa)
+                self._reciclar(trab, "Processo de extração encerrou inesperadamente")
+                continue
+            trab.tarefa = tarefa
+            trab.inicio = time.monotonic()
@@ -1,17 +1,25 @@
 import sys
 import os
+import re
+import time
 import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError
 from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QTabWidget, QProgressBar, QComboBox, QRadioButton, 
                              QButtonGroup, QFileDialog, QMessageBox, QTableWidget, 
                              QTableWidgetItem, QHeaderView, QFrame, QAbstractItemView)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer
+from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal, QSize, QTimer
 from PyQt6.QtGui import QIcon, QCursor, QAction
 
 # Importa a lógica dos arquivos anteriores
 from app.downloader import YouTubeEngine
+from app.assinaturas import GerenciadorAssinaturas
+from app.extracao import PoolExtracao
+from app.rotas import PoolRotas
+from app.jornal import JornalTarefas, interrompida
 from app.utils import PATHS, SETTINGS_FILE, HISTORY_FILE, carregar_json, salvar_json, formatar_tamanho, sanitizar_nome
 
 # --- ESTILO DARK MODERNO (CSS) ---
@@ -36,29 +44,87 @@ QTableWidget::item { padding: 5px; }
 QTableWidget::item:selected { background-color: #37373d; }
 """
 
+# Links que disparam análise antecipada ao colar/digitar
+RE_URL_VIDEO = re.compile(r'^https?://(?:www\.|m\.|music\.)?(?:youtube\.com/(?:watch\?\S*v=|shorts/|live/|embed/)|youtu\.be/)[\w-]{11}')
+
 # --- WORKERS (THREADS PARA NÃO TRAVAR A TELA) ---
-class AnalysisWorker(QThread):
-    finished = pyqtSignal(dict, dict, str) # info, opts, strategy_name
-    error = pyqtSignal(str)
 
-    def __init__(self, engine, url):
+class GerenciadorAnalises(QObject):
+    """
+    Análises em segundo plano por URL, sobre o pool de extração.
+    - A mesma URL em andamento é compartilhada (não analisa duas vezes).
+    - Resultados ficam num cache curto, então o clique em "Analisar" depois
+      de uma análise antecipada responde na hora.
+    - Análises de URLs que deixaram de interessar são canceladas.
+    """
+    finished = pyqtSignal(str, dict, dict, str) # url, info, opts, strategy_name
+    error = pyqtSignal(str, str) # url, mensagem
+
+    def __init__(self, pool, max_cache=20, validade=1800):
         super().__init__()
-        self.engine = engine
-        self.url = url
-
-    def run(self):
+        self.pool = pool
+        self.max_cache = max_cache
+        self.validade = validade # segundos
+        self._em_andamento = {} # url -> Future
+        self._cache = OrderedDict() # url -> (instante, (info, opts, strat))
+        # Conectados antes dos slots da janela, então rodam primeiro
+        self.finished.connect(self._guardar)
+        self.error.connect(self._esquecer)
+
+    def resultado(self, url):
+        item = self._cache.get(url)
+        if item and time.monotonic() - item[0] < self.validade:
+            self._cache.move_to_end(url)
+            return item[1]
+        self._cache.pop(url, None)
+        return None
+
+    def analisar(self, url):
+        """Garante uma análise para a URL (usa cache ou a que já está rodando)."""
+        if self.resultado(url) or url in self._em_andamento: return
         try:
-            info, opts, strat = self.engine.analisar_camaleao(self.url)
-            self.finished.emit(info, opts, strat)
+            future = self.pool.submeter(url)
+        except RuntimeError:
+            return
+        self._em_andamento[url] = future
+        # Callback roda na thread do pool; o sinal chega na thread da interface
+        future.add_done_callback(lambda f, url=url: self._concluir(url, f))
+
+    def _concluir(self, url, future):
+        if future.cancelled(): return
+        try:
+            info, opts, strat = future.result()
+        except CancelledError:
+            return
         except Exception as e:
-            self.error.emit(str(e))
+            self.error.emit(url, str(e))
+        else:
+            self.finished.emit(url, info, opts, strat)
+
+    def _guardar(self, url, info, opts, strat):
+        self._em_andamento.pop(url, None)
+        self._cache[url] = (time.monotonic(), (info, opts, strat))
+        while len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+
+    def _esquecer(self, url, err):
+        self._em_andamento.pop(url, None)
+
+    def cancelar_exceto(self, url):
+        """
+        Cancela as análises de outras URLs. As que já estão num processo
+        fazem o pool reciclar esse processo, liberando-o para a URL atual.
+        """
+        for outra in list(self._em_andamento):
+            if outra != url:
+                self.pool.cancelar(self._em_andamento.pop(outra))
 
 class DownloadWorker(QThread):
     progress = pyqtSignal(float, str) # percent, status text
     finished = pyqtSignal()
     error = pyqtSignal(str)
 
-    def __init__(self, engine, url, path, filename, type_, res, opts):
+    def __init__(self, engine, url, path, filename, type_, res, opts, job_id=None, info=None):
         super().__init__()
         self.engine = engine
         self.url = url
@@ -67,6 +133,8 @@ class DownloadWorker(QThread):
         self.type_ = type_
         self.res = res
         self.opts = opts
+        self.job_id = job_id # tarefa do diário sendo retomada
+        self.info = info or {} # análise do vídeo baixado, para o histórico
 
     def run(self):
         def hook(d):
@@ -80,11 +148,37 @@ class DownloadWorker(QThread):
                 self.progress.emit(100, "Processando finalização...")
 
         try:
-            self.engine.baixar(self.url, self.path, self.filename, self.type_, self.res, self.opts, hook)
+            self.engine.baixar(self.url, self.path, self.filename, self.type_, self.res, self.opts, hook, tarefa_id=self.job_id)
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
 
+class SyncWorker(QThread):
+    log = pyqtSignal(str)
+    progress = pyqtSignal(float, str)
+    finished = pyqtSignal(int) # total baixado
+    error = pyqtSignal(str)
+
+    def __init__(self, assinaturas, url=None):
+        super().__init__()
+        self.assinaturas = assinaturas
+        self.url = url
+
+    def run(self):
+        def hook(d):
+            if d['status'] == 'downloading':
+                try:
+                    val = float(d.get('_percent_str', '0%').replace('%', ''))
+                    self.progress.emit(val, f"Baixando: {int(val)}%")
+                except: pass
+
+        try:
+            total = self.assinaturas.sincronizar(self.url, progress_hook=hook, log=self.log.emit,
+                                                 cancelado=self.isInterruptionRequested)
+            self.finished.emit(total)
+        except Exception as e:
+            self.error.emit(str(e))
+
 # --- JANELA PRINCIPAL ---
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -94,11 +188,24 @@ class MainWindow(QMainWindow):
         self.setStyleSheet(STYLESHEET)
 
         # Inicializa Engine
-        self.engine = YouTubeEngine()
         self.settings = carregar_json(SETTINGS_FILE, {"paths": []})
+        self.rotas = PoolRotas.de_config(self.settings.get("rotas"))
+        if len(self.rotas.rotas) > 1:
+            self.rotas.iniciar_sondas()
+        self.jornal = JornalTarefas()
+        self.engine = YouTubeEngine(self.rotas, self.jornal)
         self.history = carregar_json(HISTORY_FILE, [])
         self.download_folder = self.settings["paths"][0] if self.settings["paths"] else os.path.join(os.path.expanduser("~"), "Downloads")
 
+        # Análises rodam em processos separados para não travar a interface
+        self.pool_extracao = PoolExtracao(self.engine, processos=self.settings.get("processos_extracao"), rotas=self.rotas)
+        self.analises = GerenciadorAnalises(self.pool_extracao)
+        self.analises.finished.connect(self.on_analysis_finished)
+        self.analises.error.connect(self.on_analysis_error)
+        self.url_aguardada = None # URL cujo "Analisar" foi clicado
+        self.url_exibida = None # URL cujos detalhes estão na tela
+        self.baixando = False # download da aba 1 em andamento
+
         # Widget Central
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -110,11 +217,17 @@ class MainWindow(QMainWindow):
 
         self.setup_single_tab()
         self.setup_playlist_tab() # Pode implementar similar ao single
+        self.setup_subscriptions_tab()
         self.setup_history_tab()
 
         # Variáveis de Estado
         self.current_video_info = None
         self.current_video_opts = None
+        self.fila_retomada = [] # tarefas do diário aguardando, uma por vez
+        self.worker_retomada = None
+
+        # Retoma downloads interrompidos na última execução
+        QTimer.singleShot(0, self.retomar_tarefas)
 
     # ==========================
     # ABA 1: DOWNLOAD ÚNICO
@@ -137,6 +250,13 @@ class MainWindow(QMainWindow):
         self.btn_analyze.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         self.btn_analyze.clicked.connect(self.iniciar_analise)
 
+        # Análise antecipada: começa logo que um link válido é colado/digitado
+        self.timer_analise = QTimer(self)
+        self.timer_analise.setSingleShot(True)
+        self.timer_analise.setInterval(400)
+        self.timer_analise.timeout.connect(self.analise_antecipada)
+        self.txt_url.textChanged.connect(self.on_url_changed)
+
         url_layout.addWidget(lbl_url)
         url_layout.addWidget(self.txt_url)
         url_layout.addWidget(self.btn_analyze)
@@ -214,23 +334,70 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(tab, "Download Único")
 
     # --- Lógica da Aba 1 ---
+    def on_url_changed(self, text):
+        url = text.strip()
+        if self.baixando:
+            # Só análise antecipada; a tela fica com o download atual
+            self.timer_analise.start()
+            return
+        if url != self.url_exibida:
+            self.url_exibida = None
+            self.details_frame.setVisible(False)
+            self.btn_download.setEnabled(False)
+        # Trocou o link durante uma análise pedida: ela deixa de ser aguardada
+        if self.url_aguardada and url != self.url_aguardada:
+            self.url_aguardada = None
+            self.btn_analyze.setEnabled(True)
+            self.lbl_status.setText("Aguardando link...")
+            self.lbl_status.setStyleSheet("color: #aaaaaa; font-style: italic;")
+        self.timer_analise.start() # reinicia o debounce
+
+    def analise_antecipada(self):
+        url = self.txt_url.text().strip()
+        if not RE_URL_VIDEO.match(url): return
+
+        self.analises.cancelar_exceto(url)
+        resultado = self.analises.resultado(url)
+        if resultado:
+            self.on_analysis_finished(url, *resultado)
+            return
+        self.analises.analisar(url)
+        if self.url_aguardada != url and not self.baixando:
+            self.lbl_status.setText("Analisando em segundo plano...")
+            self.lbl_status.setStyleSheet("color: #aaaaaa; font-style: italic;")
+
     def iniciar_analise(self):
         url = self.txt_url.text().strip()
         if not url: return
 
+        self.url_aguardada = url
+        self.analises.cancelar_exceto(url)
+
+        # Já analisada antecipadamente: responde na hora
+        resultado = self.analises.resultado(url)
+        if resultado:
+            self.on_analysis_finished(url, *resultado)
+            return
+
         self.lbl_status.setText("Analisando (Tentando 5 estratégias)...")
         self.lbl_status.setStyleSheet("color: #00aaff;")
         self.btn_analyze.setEnabled(False)
         self.details_frame.setVisible(False)
         self.btn_download.setEnabled(False)
 
-        # Inicia Thread
-        self.worker_analysis = AnalysisWorker(self.engine, url)
-        self.worker_analysis.finished.connect(self.on_analysis_finished)
-        self.worker_analysis.error.connect(self.on_analysis_error)
-        self.worker_analysis.start()
+        # Compartilha a análise antecipada da mesma URL, se estiver rodando
+        self.analises.analisar(url)
 
-    def on_analysis_finished(self, info, opts, strat_name):
+    def on_analysis_finished(self, url, info, opts, strat_name):
+        # Resultado de uma URL que já saiu da caixa de texto: só fica no cache
+        if url != self.txt_url.text().strip(): return
+        # Download em andamento: exibido quando ele terminar
+        if self.baixando: return
+        # Detalhes já na tela: não sobrescreve o nome editado sem pedido do usuário
+        if url == self.url_exibida and url != self.url_aguardada: return
+
+        self.url_exibida = url
+        self.url_aguardada = None
         self.current_video_info = info
         self.current_video_opts = opts
         
@@ -256,14 +423,18 @@ class MainWindow(QMainWindow):
         self.details_frame.setVisible(True)
         self.btn_download.setEnabled(True)
 
-    def on_analysis_error(self, err_msg):
+    def on_analysis_error(self, url, err_msg):
+        # Falha de análise antecipada só aparece se o usuário pediu a análise
+        if url != self.url_aguardada: return
+
+        self.url_aguardada = None
         self.lbl_status.setText("Erro na análise.")
         self.lbl_status.setStyleSheet("color: #ff5555;")
         self.btn_analyze.setEnabled(True)
         QMessageBox.critical(self, "Erro", f"Falha ao analisar:\n{err_msg}")
 
     def iniciar_download(self):
-        if not self.current_video_info: return
+        if not self.current_video_info or self.baixando: return
         
         url = self.txt_url.text()
         nome = self.txt_filename.text()
@@ -274,13 +445,15 @@ class MainWindow(QMainWindow):
         res = self.cb_quality.currentText()
 
         # UI Update
+        self.baixando = True
         self.btn_download.setEnabled(False)
         self.btn_analyze.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
 
         # Thread de Download
-        self.worker_download = DownloadWorker(self.engine, url, pasta, nome, tipo, res, self.current_video_opts)
+        self.worker_download = DownloadWorker(self.engine, url, pasta, nome, tipo, res, self.current_video_opts,
+                                              info=self.current_video_info)
         self.worker_download.progress.connect(self.update_progress)
         self.worker_download.finished.connect(self.on_download_finished)
         self.worker_download.error.connect(self.on_download_error)
@@ -291,20 +464,81 @@ class MainWindow(QMainWindow):
         self.lbl_status.setText(text)
 
     def on_download_finished(self):
+        self.baixando = False
         self.lbl_status.setText("Download Concluído!")
         self.btn_download.setEnabled(True)
         self.btn_analyze.setEnabled(True)
         self.progress_bar.setVisible(False)
         
-        # Registra histórico
-        self.registrar_historico()
+        # Registra histórico com os dados do vídeo que foi baixado
+        worker = self.worker_download
+        self.registrar_historico(worker.info, worker.type_, worker.path)
         QMessageBox.information(self, "Sucesso", "Download finalizado com sucesso!")
+        self.exibir_analise_pendente()
 
     def on_download_error(self, err):
+        self.baixando = False
         self.lbl_status.setText("Erro no download.")
         self.btn_download.setEnabled(True)
         self.btn_analyze.setEnabled(True)
         QMessageBox.critical(self, "Erro", str(err))
+        self.exibir_analise_pendente()
+
+    def exibir_analise_pendente(self):
+        """Link trocado durante o download: mostra a análise dele, se já saiu."""
+        url = self.txt_url.text().strip()
+        if url == self.url_exibida: return
+        self.on_url_changed(url)
+        resultado = self.analises.resultado(url)
+        if resultado:
+            self.on_analysis_finished(url, *resultado)
+
+    # --- Retomada de downloads interrompidos ---
+    def retomar_tarefas(self):
+        tarefas = self.jornal.pendentes()
+        if not tarefas: return
+
+        # Falhas do próprio vídeo só são repetidas se o usuário pedir
+        com_erro = [t for t in tarefas if not interrompida(t)]
+        if com_erro:
+            lista = "\n".join(f"- {t['nome']}: {t['erro']}" for t in com_erro)
+            resp = QMessageBox.question(self, "Downloads com erro",
+                                        f"Estes downloads falharam na última execução:\n{lista}\n\nTentar de novo?")
+            if resp != QMessageBox.StandardButton.Yes:
+                for t in com_erro:
+                    self.jornal.descartar(t['id'])
+                tarefas = [t for t in tarefas if interrompida(t)]
+
+        self.fila_retomada = tarefas
+        self.retomar_proxima()
+
+    def retomar_proxima(self):
+        """Retoma as tarefas uma de cada vez, para não disputar banda e rotas."""
+        if not self.fila_retomada:
+            self.worker_retomada = None
+            return
+        tarefa = self.fila_retomada.pop(0)
+        self.lbl_status.setText(f"Retomando {tarefa['nome']} ({len(self.fila_retomada)} na fila)...")
+        self.lbl_status.setStyleSheet("color: #00aaff;")
+
+        worker = DownloadWorker(self.engine, tarefa['url'], tarefa['pasta'], tarefa['nome'],
+                                tarefa['tipo'], tarefa['resolucao'], tarefa['opts'], job_id=tarefa['id'])
+        worker.progress.connect(lambda val, text, nome=tarefa['nome']: self.lbl_status.setText(f"{nome}: {text}"))
+        worker.finished.connect(lambda t=tarefa: self.on_retomada_finished(t))
+        worker.error.connect(lambda err, t=tarefa: self.on_retomada_error(t, err))
+        self.worker_retomada = worker
+        worker.start()
+
+    def on_retomada_finished(self, tarefa):
+        self.lbl_status.setText(f"Download retomado concluído: {tarefa['nome']}")
+        self.lbl_status.setStyleSheet("color: #4CAF50;")
+        self.registrar_historico({'title': tarefa['nome']}, tarefa['tipo'], tarefa['pasta'])
+        self.retomar_proxima()
+
+    def on_retomada_error(self, tarefa, err):
+        self.lbl_status.setText(f"Falha ao retomar {tarefa['nome']}: {err}")
+        self.lbl_status.setStyleSheet("color: #ff5555;")
+        self.retomar_proxima()
 
     # ==========================
     # ABA 2: PLAYLIST (Simplificada para brevidade)
@@ -317,7 +551,108 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(tab, "Playlist")
 
     # ==========================
-    # ABA 3: HISTÓRICO
+    # ABA 3: ASSINATURAS
+    # ==========================
+    def setup_subscriptions_tab(self):
+        self.assinaturas = GerenciadorAssinaturas(self.engine, self.pool_extracao)
+        self.worker_sync = None
+
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        # Nova fonte
+        add_layout = QHBoxLayout()
+        self.txt_sub_url = QLineEdit()
+        self.txt_sub_url.setPlaceholderText("Link do canal ou playlist...")
+        self.cb_sub_tipo = QComboBox()
+        self.cb_sub_tipo.addItems(["Vídeo (MP4)", "Áudio (MP3)"])
+        btn_add = QPushButton("Assinar")
+        btn_add.clicked.connect(self.adicionar_assinatura)
+
+        add_layout.addWidget(self.txt_sub_url)
+        add_layout.addWidget(self.cb_sub_tipo)
+        add_layout.addWidget(btn_add)
+        layout.addLayout(add_layout)
+
+        # Tabela de fontes
+        self.table_subs = QTableWidget()
+        self.table_subs.setColumnCount(4)
+        self.table_subs.setHorizontalHeaderLabels(["Fonte", "Tipo", "Última Sincronização", "Pasta"])
+        self.table_subs.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table_subs.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_subs.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table_subs)
+
+        self.lbl_sync = QLabel("Nenhuma sincronização em andamento.")
+        self.lbl_sync.setStyleSheet("color: #aaaaaa; font-style: italic;")
+        layout.addWidget(self.lbl_sync)
+
+        # Botões
+        btn_layout = QHBoxLayout()
+        btn_sync = QPushButton("Sincronizar Agora")
+        btn_sync.clicked.connect(lambda: self.sincronizar_assinaturas())
+        btn_remove = QPushButton("Remover")
+        btn_remove.clicked.connect(self.remover_assinatura)
+        btn_layout.addWidget(btn_sync)
+        btn_layout.addWidget(btn_remove)
+        layout.addLayout(btn_layout)
+
+        self.tabs.addTab(tab, "Assinaturas")
+        self.carregar_assinaturas_tabela()
+
+        # Sincronização periódica (minutos, configurável em settings.json)
+        intervalo = self.settings.get("intervalo_assinaturas", 60)
+        self.timer_sync = QTimer(self)
+        self.timer_sync.timeout.connect(lambda: self.sincronizar_assinaturas())
+        if intervalo:
+            self.timer_sync.start(int(intervalo) * 60 * 1000)
+
+    def carregar_assinaturas_tabela(self):
+        self.table_subs.setRowCount(0)
+        for row, (url, fonte) in enumerate(self.assinaturas.fontes.items()):
+            self.table_subs.insertRow(row)
+            self.table_subs.setItem(row, 0, QTableWidgetItem(url))
+            self.table_subs.setItem(row, 1, QTableWidgetItem(fonte.get('tipo', '').upper()))
+            self.table_subs.setItem(row, 2, QTableWidgetItem(fonte.get('ultima_sincronizacao') or '-'))
+            self.table_subs.setItem(row, 3, QTableWidgetItem(fonte.get('pasta', '')))
+
+    def adicionar_assinatura(self):
+        url = self.txt_sub_url.text().strip()
+        if not url: return
+        tipo = "audio" if self.cb_sub_tipo.currentIndex() == 1 else "video"
+        pasta = self.cb_path.currentText()
+
+        url = self.assinaturas.adicionar(url, pasta, tipo)
+        self.txt_sub_url.clear()
+        self.carregar_assinaturas_tabela()
+
+        # A primeira sincronização só registra os vídeos já publicados
+        self.sincronizar_assinaturas(url)
+
+    def remover_assinatura(self):
+        row = self.table_subs.currentRow()
+        if row < 0: return
+        self.assinaturas.remover(self.table_subs.item(row, 0).text())
+        self.carregar_assinaturas_tabela()
+
+    def sincronizar_assinaturas(self, url=None):
+        if self.worker_sync and self.worker_sync.isRunning(): return
+        if not self.assinaturas.fontes: return
+
+        self.lbl_sync.setText("Sincronizando...")
+        self.worker_sync = SyncWorker(self.assinaturas, url)
+        self.worker_sync.log.connect(self.lbl_sync.setText)
+        self.worker_sync.progress.connect(lambda val, text: self.lbl_sync.setText(text))
+        self.worker_sync.finished.connect(self.on_sync_finished)
+        self.worker_sync.error.connect(lambda err: self.lbl_sync.setText(f"Erro na sincronização: {err}"))
+        self.worker_sync.start()
+
+    def on_sync_finished(self, total):
+        self.lbl_sync.setText(f"Sincronização concluída: {total} novo(s) vídeo(s).")
+        self.carregar_assinaturas_tabela()
+
+    # ==========================
+    # ABA 4: HISTÓRICO
     # ==========================
     def setup_history_tab(self):
         tab = QWidget()
@@ -348,12 +683,12 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(tab, "Histórico")
         self.carregar_historico_tabela()
 
-    def registrar_historico(self):
-        info = self.current_video_info
+    def registrar_historico(self, info=None, tipo=None, pasta=None):
+        info = info or self.current_video_info
         item = {
             "title": info.get('title'),
-            "type": "audio" if self.rb_audio.isChecked() else "video",
-            "path": self.cb_path.currentText(),
+            "type": tipo or ("audio" if self.rb_audio.isChecked() else "video"),
+            "path": pasta or self.cb_path.currentText(),
             "size": info.get('filesize') or info.get('filesize_approx'),
             "date": datetime.now().strftime("%d/%m/%Y %H:%M")
         }
@@ -380,6 +715,14 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "Erro", "Pasta não encontrada.")
 
+    def closeEvent(self, event):
+        if self.worker_sync and self.worker_sync.isRunning():
+            self.worker_sync.requestInterruption()
+        self.pool_extracao.encerrar()
+        self.jornal.fechar()
+        self.engine.fechar()
+        super().closeEvent(event)
+
     # --- Auxiliares ---
     def escolher_pasta(self):
         folder = QFileDialog.getExistingDirectory(self, "Selecionar Pasta")
@@ -0,0 +1,185 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+from app.rotas import eh_bloqueio, eh_falha_de_rede
+from app.utils import PATHS
+
+# Diário de tarefas (uma operação JSON por linha, só acrescenta)
+JORNAL_FILE = os.path.join(PATHS["data"], "jobs.jsonl")
+
+
+def interrompida(tarefa):
+    """
+    Diz se a tarefa parou por fora (app fechado, rede, bloqueio) e vale
+    retomar sozinha. Erros do próprio vídeo (formato indisponível, vídeo
+    removido) se repetiriam a cada tentativa.
+    """
+    erro = tarefa.get('erro')
+    return not erro or eh_falha_de_rede(erro) or eh_bloqueio(erro) or 'interrupt' in erro.lower()
+
+
+class JornalTarefas:
+    """
+    Registro durável dos downloads em andamento para retomar após fechar
+    ou travar o app. O yt-dlp continua os arquivos .part sozinho desde que
+    o download seja refeito com a mesma pasta, nome e formato.
+
+    Criação e conclusão vão para o disco logo; o progresso só fica na
+    memória (o último valor por tarefa) e é gravado em lote pela thread de
+    fundo, então o hook de progresso não faz I/O.
+    """
+    def __init__(self, arquivo=JORNAL_FILE, intervalo=2.0, max_tentativas=3):
+        self.arquivo = arquivo
+        self.intervalo = intervalo
+        self.max_tentativas = max_tentativas
+
+        self._lock = threading.Lock()
+        self._buffer = []              # linhas aguardando gravação
+        self._progresso = {}           # id -> último progresso não gravado
+        self._acordar = threading.Event()
+        self._ativo = True
+
+        # Tarefas que esgotaram as tentativas saem do diário na compactação
+        self.tarefas = {id_: t for id_, t in self._carregar().items()
+                        if t.get('tentativas', 0) < self.max_tentativas}
+        self._compactar()
+
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    # --- Leitura e compactação ---
+    def _carregar(self):
+        tarefas = {}
+        if not os.path.exists(self.arquivo):
+            return tarefas
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        reg = json.loads(linha)
+                    except ValueError:
+                        continue  # linha cortada por um crash no meio da escrita
+                    op, id_ = reg.pop('op', None), reg.get('id')
+                    if op == 'novo':
+                        tarefas[id_] = reg
+                    elif id_ in tarefas:
+                        if op in ('fim', 'descartado'):
+                            del tarefas[id_]
+                        elif op == 'progresso':
+                            tarefas[id_].update(pct=reg.get('pct'), bytes=reg.get('bytes'))
+                        elif op == 'erro':
+                            tarefas[id_]['tentativas'] = tarefas[id_].get('tentativas', 0) + 1
+                            tarefas[id_]['erro'] = reg.get('erro')
+        except Exception as e:
+            print(f"Erro ao ler diário de tarefas: {e}")
+        return tarefas
+
+    def _compactar(self):
+        """Regrava o diário só com as tarefas em aberto (troca atômica)."""
+        temp = self.arquivo + ".tmp"
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                for tarefa in self.tarefas.values():
+                    f.write(json.dumps({'op': 'novo', **tarefa}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.arquivo)
+        except Exception as e:
+            print(f"Erro ao compactar diário de tarefas: {e}")
+
+    # --- Gravação ---
+    def _enfileirar(self, reg, imediato=False):
+        with self._lock:
+            self._buffer.append(json.dumps(reg, ensure_ascii=False))
+        if imediato:
+            self._acordar.set()
+
+    def _loop(self):
+        while self._ativo:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            self.gravar()
+
+    def gravar(self):
+        with self._lock:
+            linhas = self._buffer
+            self._buffer = []
+            for id_, prog in self._progresso.items():
+                linhas.append(json.dumps({'op': 'progresso', 'id': id_, **prog}))
+            self._progresso = {}
+        if not linhas: return
+
+        try:
+            with open(self.arquivo, 'a', encoding='utf-8') as f:
+                f.write("\n".join(linhas) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Erro ao gravar diário de tarefas: {e}")
+
+    def fechar(self):
+        self._ativo = False
+        self._acordar.set()
+        self._thread.join(timeout=5)
+        self.gravar()
+
+    # --- API ---
+    def registrar(self, url, pasta, nome, tipo, resolucao, opts):
+        """
+        Abre uma tarefa. Se já houver uma em aberto para o mesmo arquivo
+        (url, pasta e nome), ela é reaproveitada com as opções novas.
+        """
+        with self._lock:
+            existente = next((t for t in self.tarefas.values()
+                              if (t['url'], t['pasta'], t['nome']) == (url, pasta, nome)), None)
+            id_ = existente['id'] if existente else uuid.uuid4().hex[:12]
+            tarefa = {
+                'id': id_, 'url': url, 'pasta': pasta, 'nome': nome, 'tipo': tipo,
+                'resolucao': resolucao, 'opts': opts, 'pct': existente.get('pct', 0) if existente else 0,
+                'data': datetime.now().strftime("%d/%m/%Y %H:%M")
+            }
+            self.tarefas[id_] = tarefa
+            self._progresso.pop(id_, None)
+        # Um 'novo' com o mesmo id substitui a tarefa (e zera as tentativas) na releitura
+        self._enfileirar({'op': 'novo', **tarefa}, imediato=True)
+        return id_
+
+    def progresso(self, id_, d):
+        """Chamado pelo hook de progresso: só atualiza a memória."""
+        if d.get('status') != 'downloading': return
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        baixados = d.get('downloaded_bytes') or 0
+        pct = round(baixados * 100 / total, 1) if total else None
+        with self._lock:
+            tarefa = self.tarefas.get(id_)
+            if not tarefa: return
+            tarefa['pct'], tarefa['bytes'] = pct, baixados
+            self._progresso[id_] = {'pct': pct, 'bytes': baixados}
+
+    def concluir(self, id_):
+        with self._lock:
+            self.tarefas.pop(id_, None)
+            self._progresso.pop(id_, None)
+        self._enfileirar({'op': 'fim', 'id': id_}, imediato=True)
+
+    def falhar(self, id_, erro):
+        with self._lock:
+            tarefa = self.tarefas.get(id_)
+            if not tarefa: return
+            tarefa['tentativas'] = tarefa.get('tentativas', 0) + 1
+            tarefa['erro'] = str(erro)
+        self._enfileirar({'op': 'erro', 'id': id_, 'erro': str(erro)}, imediato=True)
+
+    def descartar(self, id_):
+        with self._lock:
+            self.tarefas.pop(id_, None)
+            self._progresso.pop(id_, None)
+        self._enfileirar({'op': 'descartado', 'id': id_}, imediato=True)
+
+    def pendentes(self):
+        """Tarefas não concluídas que ainda podem ser retomadas."""
+        with self._lock:
+            return [dict(t) for t in self.tarefas.values()
+                    if t.get('tentativas', 0) < self.max_tentativas]
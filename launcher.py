@@ -172,6 +172,10 @@ class LauncherWindow(QWidget):
             sys.exit(1)
 
 if __name__ == "__main__":
+    # Necessário para os processos de extração no executável congelado
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
     launcher = LauncherWindow()
     launcher.show()
@@ -0,0 +1,198 @@
+import time
+import threading
+import yt_dlp
+
+# Trechos de erro que indicam bloqueio/limitação do endereço de saída (quarentena imediata)
+SINAIS_BLOQUEIO = ('http error 429', 'too many requests', 'not a bot', 'rate-limit',
+                   'rate limit', 'temporarily blocked')
+
+# 403 também acontece por cliente/vídeo (é o que as 5 estratégias contornam):
+# conta como falha comum da rota, não como bloqueio
+SINAIS_RECUSA = ('http error 403', 'forbidden')
+
+# Falhas de conexão que pesam contra a rota (vídeo privado, link inválido etc. não pesam).
+# "Unable to download" sozinho não entra: o yt-dlp usa para qualquer erro de página
+SINAIS_REDE = ('timed out', 'timeout', 'connection', 'proxy', 'tunnel', 'socks',
+               'network is unreachable', 'ssl')
+
+URL_SONDA = "https://www.youtube.com/generate_204"
+
+
+def eh_bloqueio(erro):
+    """Diz se a mensagem de erro parece bloqueio por IP (e não link inválido)."""
+    texto = str(erro).lower()
+    return any(s in texto for s in SINAIS_BLOQUEIO)
+
+
+def eh_recusa(erro):
+    texto = str(erro).lower()
+    return any(s in texto for s in SINAIS_RECUSA)
+
+
+def eh_falha_de_rede(erro):
+    texto = str(erro).lower()
+    return any(s in texto for s in SINAIS_REDE)
+
+
+class Rota:
+    """
+    Um caminho de saída: proxy HTTP/SOCKS, endereço local de origem, ou
+    conexão direta (ambos vazios).
+    """
+    def __init__(self, proxy=None, source_address=None, nome=None):
+        self.proxy = proxy
+        self.source_address = source_address
+        self.nome = nome or proxy or source_address or "direta"
+
+        self.saude = 1.0          # média móvel de sucesso (0 a 1)
+        self.ativos = 0           # análises/downloads usando a rota agora
+        self.falhas_seguidas = 0
+        self.quarentenas = 0      # quarentenas seguidas, para o recuo exponencial
+        self.quarentena_ate = 0.0
+        self.em_prova = False     # saiu da quarentena, aguardando confirmação
+
+    def opcoes(self):
+        """Parâmetros do yt-dlp para sair por esta rota."""
+        opts = {}
+        if self.proxy: opts['proxy'] = self.proxy
+        if self.source_address: opts['source_address'] = self.source_address
+        return opts
+
+    def __repr__(self):
+        return f"Rota({self.nome}, saude={self.saude:.2f}, ativos={self.ativos})"
+
+
+class PoolRotas:
+    """
+    Distribui análises e downloads entre as rotas de saída.
+    - Escolhe a rota menos ocupada (desempate pela saúde).
+    - Bloqueios (429, "not a bot") ou falhas seguidas (inclusive 403) põem a
+      rota em quarentena, com tempo dobrando a cada reincidência.
+    - Vencida a quarentena, a rota volta "em prova": recebe um uso por vez
+      até ter um sucesso (ou passar numa sonda).
+    relogio e sonda são injetáveis para testes com proxies locais.
+    """
+    def __init__(self, rotas=None, quarentena=60, quarentena_max=1800, limite_falhas=3,
+                 velocidade_minima=50 * 1024, relogio=time.monotonic, sonda=None):
+        self.rotas = rotas or [Rota()]
+        self.quarentena = quarentena
+        self.quarentena_max = quarentena_max
+        self.limite_falhas = limite_falhas
+        self.velocidade_minima = velocidade_minima  # bytes/s abaixo disso conta como lento
+        self.relogio = relogio
+        self.sonda = sonda or self._sonda_padrao
+        self._lock = threading.Lock()
+
+    @classmethod
+    def de_config(cls, config):
+        """
+        Monta o pool a partir de settings.json. Aceita uma lista com URLs de
+        proxy ("socks5://127.0.0.1:1080", "http://host:3128"), "direta", ou
+        dicts {"proxy": ..., "source_address": ..., "nome": ...}.
+        """
+        rotas = []
+        for item in config or []:
+            if isinstance(item, dict):
+                rotas.append(Rota(item.get('proxy'), item.get('source_address'), item.get('nome')))
+            elif item == "direta":
+                rotas.append(Rota())
+            else:
+                rotas.append(Rota(proxy=item))
+        return cls(rotas)
+
+    # --- Atribuição ---
+    def _disponivel(self, rota, agora):
+        if rota.quarentena_ate > agora: return False
+        if rota.em_prova and rota.ativos > 0: return False
+        return True
+
+    def adquirir(self):
+        """Reserva a rota menos ocupada. Se todas estão em quarentena, usa a que sai primeiro."""
+        with self._lock:
+            agora = self.relogio()
+            candidatas = [r for r in self.rotas if self._disponivel(r, agora)]
+            if candidatas:
+                rota = min(candidatas, key=lambda r: (r.ativos, -r.saude))
+            else:
+                rota = min(self.rotas, key=lambda r: (r.quarentena_ate, r.ativos))
+            if rota.quarentena_ate and rota.quarentena_ate <= agora:
+                rota.quarentena_ate = 0.0
+                rota.em_prova = True
+            rota.ativos += 1
+            return rota
+
+    def liberar(self, rota, erro=None, velocidade=None):
+        """Devolve a rota e registra o resultado do uso."""
+        with self._lock:
+            rota.ativos = max(0, rota.ativos - 1)
+            self._registrar(rota, erro, velocidade)
+
+    def _registrar(self, rota, erro, velocidade):
+        if erro is None:
+            lento = velocidade is not None and velocidade < self.velocidade_minima
+            rota.saude = rota.saude * 0.8 + (0.5 if lento else 1.0) * 0.2
+            if not lento:
+                rota.falhas_seguidas = 0
+                rota.quarentenas = 0
+                rota.em_prova = False
+            return
+
+        bloqueio = eh_bloqueio(erro)
+        if not bloqueio and not eh_recusa(erro) and not eh_falha_de_rede(erro):
+            return  # erro do vídeo, não da rota
+
+        rota.saude *= 0.8
+        rota.falhas_seguidas += 1
+        if rota.em_prova or bloqueio or rota.falhas_seguidas >= self.limite_falhas:
+            self._quarentenar(rota)
+
+    def _quarentenar(self, rota):
+        duracao = min(self.quarentena * (2 ** rota.quarentenas), self.quarentena_max)
+        rota.quarentena_ate = self.relogio() + duracao
+        rota.quarentenas += 1
+        rota.falhas_seguidas = 0
+        rota.em_prova = False
+        print(f"Rota {rota.nome} em quarentena por {int(duracao)}s")
+
+    # --- Sondagem ---
+    def _sonda_padrao(self, rota):
+        opts = {'quiet': True, 'no_warnings': True, 'nocheckcertificate': True, 'socket_timeout': 10}
+        opts.update(rota.opcoes())
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            ydl.urlopen(URL_SONDA).read(1)
+
+    def sondar_quarentena(self):
+        """
+        Testa as rotas cuja quarentena venceu; as que respondem voltam ao
+        normal e as que falham ganham mais uma quarentena.
+        """
+        with self._lock:
+            agora = self.relogio()
+            vencidas = [r for r in self.rotas if r.quarentena_ate and r.quarentena_ate <= agora and r.ativos == 0]
+            for rota in vencidas:
+                rota.quarentena_ate = 0.0
+                rota.em_prova = True
+                rota.ativos += 1
+
+        for rota in vencidas:
+            try:
+                self.sonda(rota)
+                self.liberar(rota)
+            except Exception as e:
+                with self._lock:
+                    rota.ativos = max(0, rota.ativos - 1)
+                    self._quarentenar(rota)
+                print(f"Sonda da rota {rota.nome} falhou: {e}")
+        return vencidas
+
+    def iniciar_sondas(self, intervalo=30):
+        """Sonda periodicamente as rotas em quarentena numa thread de fundo."""
+        def loop():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.sondar_quarentena()
+                except Exception as e:
+                    print(f"Erro ao sondar rotas: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
@@ -0,0 +1,141 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Opções trocadas a cada uso, sem criar outra instância
+OPCOES_POR_USO = ('outtmpl', 'progress_hooks', 'format')
+
+
+class _Sessao:
+    """Um YoutubeDL aquecido e o estado necessário para reutilizá-lo."""
+    def __init__(self, ydl, versao):
+        self.ydl = ydl
+        self.versao = versao
+        self.hooks = []
+        self.ultimo_uso = time.monotonic()
+        # Guardados para desfazer as trocas por uso
+        self.outtmpl_original = ydl.params.get('outtmpl')
+        self.format_original = ydl.params.get('format')
+        self.seletor_original = getattr(ydl, 'format_selector', None)
+        # Hook fixo que repassa para os hooks do uso atual
+        ydl.add_progress_hook(self._repassar)
+
+    def _repassar(self, d):
+        for hook in self.hooks:
+            hook(d)
+
+    def fechar(self):
+        try:
+            self.ydl.close()
+        except Exception: pass
+
+
+class PoolSessoes:
+    """
+    Instâncias de YoutubeDL reaproveitadas entre análises e downloads,
+    separadas por perfil (as opções, tirando outtmpl/hooks/formato).
+    Reusar a instância mantém extratores, handlers HTTP e conexões
+    keep-alive já abertos.
+
+    Cada instância é usada por uma thread de cada vez (o YoutubeDL não é
+    thread-safe); instâncias paradas por mais de 'ocioso' segundos são
+    fechadas. 'versao(opts)' identifica o estado externo usado na criação
+    (ex.: o jar de cookies); se mudar, a instância é descartada.
+    """
+    def __init__(self, criar, versao=None, ocioso=300, max_por_perfil=4):
+        self.criar = criar
+        self.versao = versao or (lambda opts: None)
+        self.ocioso = ocioso
+        self.max_por_perfil = max_por_perfil
+        self._lock = threading.Lock()
+        self._livres = {}  # chave do perfil -> [_Sessao]
+
+        threading.Thread(target=self._loop_limpeza, daemon=True).start()
+
+    @staticmethod
+    def _chave(opts):
+        return json.dumps(opts, sort_keys=True, default=repr)
+
+    @contextmanager
+    def usar(self, opts):
+        """Empresta um YoutubeDL com as opções; outtmpl, hooks e formato valem só neste uso."""
+        base = {k: v for k, v in opts.items() if k not in OPCOES_POR_USO}
+        chave = self._chave(base)
+        versao = self.versao(base)
+
+        sessao = None
+        descartadas = []
+        with self._lock:
+            livres = self._livres.get(chave, [])
+            while livres and sessao is None:
+                candidata = livres.pop()
+                if candidata.versao is versao:
+                    sessao = candidata
+                else:
+                    descartadas.append(candidata)
+        for s in descartadas:
+            s.fechar()
+        if sessao is None:
+            sessao = _Sessao(self.criar(base), versao)
+
+        self._aplicar(sessao, opts)
+        try:
+            yield sessao.ydl
+        finally:
+            self._restaurar(sessao)
+            self._devolver(chave, sessao)
+
+    # --- Trocas por uso ---
+    def _aplicar(self, sessao, opts):
+        ydl = sessao.ydl
+        sessao.hooks = list(opts.get('progress_hooks') or [])
+        if 'outtmpl' in opts:
+            atual = sessao.outtmpl_original
+            ydl.params['outtmpl'] = {**atual, 'default': opts['outtmpl']} if isinstance(atual, dict) else opts['outtmpl']
+        if opts.get('format'):
+            ydl.params['format'] = opts['format']
+            ydl.format_selector = ydl.build_format_selector(opts['format'])
+
+    def _restaurar(self, sessao):
+        ydl = sessao.ydl
+        sessao.hooks = []
+        ydl.params['outtmpl'] = sessao.outtmpl_original
+        ydl.params['format'] = sessao.format_original
+        ydl.format_selector = sessao.seletor_original
+
+    # --- Devolução e limpeza ---
+    def _devolver(self, chave, sessao):
+        sessao.ultimo_uso = time.monotonic()
+        with self._lock:
+            livres = self._livres.setdefault(chave, [])
+            if len(livres) < self.max_por_perfil:
+                livres.append(sessao)
+                sessao = None
+        if sessao:
+            sessao.fechar()
+
+    def limpar_ociosas(self):
+        limite = time.monotonic() - self.ocioso
+        fechar = []
+        with self._lock:
+            for chave in list(self._livres):
+                livres = self._livres[chave]
+                fechar += [s for s in livres if s.ultimo_uso < limite]
+                livres[:] = [s for s in livres if s.ultimo_uso >= limite]
+                if not livres:
+                    del self._livres[chave]
+        for sessao in fechar:
+            sessao.fechar()
+
+    def _loop_limpeza(self):
+        while True:
+            time.sleep(max(self.ocioso / 2, 1))
+            self.limpar_ociosas()
+
+    def fechar(self):
+        with self._lock:
+            todas = [s for livres in self._livres.values() for s in livres]
+            self._livres = {}
+        for sessao in todas:
+            sessao.fechar()